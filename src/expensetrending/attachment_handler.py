@@ -1,14 +1,23 @@
 """Handle downloading and saving PDF attachments."""
 
+import logging
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 from .email_searcher import EmailResult
 from .gmail_client import GmailClient
 
+logger = logging.getLogger(__name__)
+
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 RESOURCES_DIR = Path("/Users/hkochhar/Documents/Expenses")
 
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w\-_.]")
+
 
 class AttachmentHandler:
     """Download and save PDF attachments from emails."""
@@ -17,44 +26,101 @@ class AttachmentHandler:
         self.client = gmail_client
         self.resources_dir = resources_dir
         self.resources_dir.mkdir(parents=True, exist_ok=True)
+        self._existing = self._load_existing()
+
+    def _load_existing(self) -> set[str]:
+        """Return the names of files already in the resources directory."""
+        with os.scandir(self.resources_dir) as entries:
+            return {entry.name for entry in entries}
 
     def download_attachments(self, email_result: EmailResult, dry_run: bool = False) -> list[Path]:
         """Download all PDF attachments from an email result."""
         downloaded_files = []
 
         for attachment in email_result.attachments:
-            filename = self._generate_filename(email_result, attachment["filename"])
-            filepath = self.resources_dir / filename
-
-            if filepath.exists():
-                print(f"  Already exists: {filename}")
-                downloaded_files.append(filepath)
-                continue
-
-            if dry_run:
-                print(f"  Would download: {filename}")
-                continue
-
-            try:
-                data = self.client.get_attachment(
-                    email_result.message_id, attachment["attachment_id"]
-                )
-                filepath.write_bytes(data)
-                print(f"  Downloaded: {filename}")
+            filepath = self._download_one(email_result, attachment, dry_run)
+            if filepath:
                 downloaded_files.append(filepath)
-            except Exception as e:
-                print(f"  Error downloading {filename}: {e}")
 
         return downloaded_files
 
+    def download_many(
+        self,
+        email_results: list[EmailResult],
+        dry_run: bool = False,
+        max_workers: int = 5,
+    ) -> list[tuple[EmailResult, Path]]:
+        """Download PDF attachments from many emails concurrently.
+
+        Returns (email, path) pairs in completion order.
+        """
+        work_items = [
+            (email_result, attachment)
+            for email_result in email_results
+            for attachment in email_result.attachments
+        ]
+        downloaded = []
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._download_one, email_result, attachment, dry_run): email_result
+                for email_result, attachment in work_items
+            }
+            for future in as_completed(futures):
+                filepath = future.result()
+                if filepath:
+                    downloaded.append((futures[future], filepath))
+
+        return downloaded
+
+    def _download_one(
+        self, email_result: EmailResult, attachment: dict, dry_run: bool
+    ) -> Optional[Path]:
+        """Download a single attachment, returning its path if it is on disk."""
+        filename = self._generate_filename(email_result, attachment["filename"])
+        filepath = self.resources_dir / filename
+
+        if filename in self._existing:
+            logger.info("  Already exists: %s", filename)
+            return filepath
+
+        if dry_run:
+            logger.info("  Would download: %s", filename)
+            return None
+
+        try:
+            data = self.client.get_attachment(
+                email_result.message_id, attachment["attachment_id"]
+            )
+            filepath.write_bytes(data)
+            self._existing.add(filename)
+            logger.info("  Downloaded: %s", filename)
+            return filepath
+        except Exception as e:
+            logger.error("  Error downloading %s: %s", filename, e)
+            return None
+
+    def has_downloads_for(self, bank: str, date: datetime, filenames: list[str]) -> bool:
+        """Return True if every named attachment for this bank and email date is on disk.
+
+        Returns False when filenames is empty, so messages whose attachments
+        are unknown are still fetched.
+        """
+        return bool(filenames) and all(
+            self._filename_for(bank, date, name) in self._existing for name in filenames
+        )
+
     def _generate_filename(self, email_result: EmailResult, original_filename: str) -> str:
         """Generate a unique filename for the attachment."""
-        date_str = email_result.date.strftime("%Y%m%d")
-        bank = email_result.bank.upper()
+        return self._filename_for(email_result.bank, email_result.date, original_filename)
 
-        safe_filename = re.sub(r"[^\w\-_.]", "_", original_filename)
+    @staticmethod
+    def _filename_for(bank: str, date: datetime, original_filename: str) -> str:
+        """Build the on-disk name {BANK}_{YYYYMMDD}_{original} for an attachment."""
+        date_str = date.strftime("%Y%m%d")
+        safe_filename = _UNSAFE_FILENAME_CHARS.sub("_", original_filename)
 
-        return f"{bank}_{date_str}_{safe_filename}"
+        return f"{bank.upper()}_{date_str}_{safe_filename}"
 
     def get_password_filepath(self, pdf_path: Path) -> Path:
         """Get the path for the password file corresponding to a PDF."""
@@ -1,15 +1,54 @@
 """MongoDB handler for storing expense data."""
 
+import re
+from collections.abc import Iterator
 from dataclasses import asdict
+from datetime import datetime
 
+import bson
 from bson import ObjectId
-from pymongo import MongoClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, MongoClient, UpdateOne
+from pymongo.write_concern import WriteConcern
 
-from .statement_parser import ExpenseItem, normalize_date_str
+from .cache import TTLCache
+from .statement_parser import ExpenseItem, normalize_date_str, parse_ddmmyyyy
 
 DEFAULT_MONGO_URI = "mongodb://localhost:27017"
 DEFAULT_DB_NAME = "expensetrending"
 DEFAULT_COLLECTION_NAME = "expenses"
+BULK_WRITE_CHUNK = 1000
+CURSOR_BATCH_SIZE = 500
+RAW_BATCH_SIZE = 1000
+DISTINCT_CACHE_TTL_SECONDS = 60
+
+# Sum amounts as integer paise so totals are exact. Documents saved before
+# amount_paise existed fall back to their float amount.
+_AMOUNT_PAISE = {"$ifNull": [
+    "$amount_paise",
+    {"$toLong": {"$round": [{"$multiply": ["$amount", 100]}, 0]}},
+]}
+NORMALIZED_DATE_REGEX = r"^\d{2}/\d{2}/\d{4}$"
+
+_clients: dict[str, MongoClient] = {}
+
+
+def get_client(mongo_uri: str = DEFAULT_MONGO_URI) -> MongoClient:
+    """Return the process-wide MongoClient for a URI, creating it on first use.
+
+    Sharing one client lets every ExpenseDB in the process reuse a single
+    connection pool.
+    """
+    client = _clients.get(mongo_uri)
+    if client is None:
+        client = MongoClient(
+            mongo_uri,
+            maxPoolSize=50,
+            socketTimeoutMS=30000,
+            retryWrites=True,
+            w=1,
+        )
+        _clients[mongo_uri] = client
+    return client
 
 
 class ExpenseDB:
@@ -20,27 +59,67 @@ class ExpenseDB:
         mongo_uri: str = DEFAULT_MONGO_URI,
         db_name: str = DEFAULT_DB_NAME,
         collection_name: str = DEFAULT_COLLECTION_NAME,
+        fast_insert: bool = False,
     ):
-        self.client = MongoClient(mongo_uri)
+        self.client = get_client(mongo_uri)
         self.db = self.client[db_name]
         self.collection = self.db[collection_name]
-
-    def save_expense(self, expense: ExpenseItem) -> str:
-        """Save a single expense to the database."""
-        result = self.collection.insert_one(asdict(expense))
-        return str(result.inserted_id)
+        self.collection.create_indexes([
+            IndexModel([("transaction_type", 1), ("bank", 1)]),
+            IndexModel([("transaction_type", 1), ("category", 1)]),
+            IndexModel([("description", "text")]),
+            IndexModel([("bank", 1), ("category", 1), ("date_iso", 1)]),
+        ])
+        self._distinct_cache = TTLCache(maxsize=64, ttl=DISTINCT_CACHE_TTL_SECONDS)
+        # Unacknowledged (w=0) writes for re-runnable bulk imports. Insert
+        # errors such as duplicate keys are silently dropped on this path.
+        self.fast_collection = (
+            self.collection.with_options(write_concern=WriteConcern(w=0))
+            if fast_insert
+            else None
+        )
 
     def save_expenses(self, expenses: list[ExpenseItem]) -> int:
         """Save multiple expenses to the database."""
-        if not expenses:
-            return 0
-        docs = [asdict(e) for e in expenses]
-        result = self.collection.insert_many(docs)
-        return len(result.inserted_ids)
+        return self.save_expenses_bulk(expenses)
+
+    def save_expenses_bulk(self, expenses: list[ExpenseItem], batch_size: int = 100) -> int:
+        """Save expenses with one unordered insert_many per batch_size chunk.
+
+        Returns the number of documents inserted. With fast_insert enabled
+        this is the number of documents sent, since writes are not acknowledged.
+        """
+        collection = self.fast_collection if self.fast_collection is not None else self.collection
+        inserted = 0
+        for start in range(0, len(expenses), batch_size):
+            docs = [self._to_document(e) for e in expenses[start:start + batch_size]]
+            result = collection.insert_many(docs, ordered=False)
+            inserted += len(result.inserted_ids)
+        self._distinct_cache.clear()
+        return inserted
+
+    @staticmethod
+    def _date_fields(date_str: str) -> dict:
+        """Return the derived date_iso/year_month fields for a DD/MM/YYYY date.
+
+        Returns an empty dict if the date cannot be parsed.
+        """
+        dt = parse_ddmmyyyy(date_str)
+        if dt is None:
+            return {}
+        return {"date_iso": dt, "year_month": f"{dt.year:04d}-{dt.month:02d}"}
+
+    @classmethod
+    def _to_document(cls, expense: ExpenseItem) -> dict:
+        """Build the stored document for an expense, including derived date fields."""
+        doc = asdict(expense)
+        doc.update(cls._date_fields(expense.date))
+        return doc
 
     def flush_collection(self) -> int:
         """Delete all documents in the collection."""
         result = self.collection.delete_many({})
+        self._distinct_cache.clear()
         return result.deleted_count
 
     def get_expense_count(self) -> int:
@@ -50,18 +129,45 @@ class ExpenseDB:
     def normalize_dates(self) -> int:
         """Migrate all date values in the collection to DD/MM/YYYY format.
 
-        Returns the number of documents updated.
+        Only documents whose date is not already DD/MM/YYYY are read, so
+        re-running the migration is cheap. Returns the number of documents updated.
         """
+        self.collection.create_index("date")
         updated = 0
-        for doc in self.collection.find():
+        ops: list[UpdateOne] = []
+        query = {"date": {"$not": {"$regex": NORMALIZED_DATE_REGEX}}}
+        for doc in self.collection.find(query, {"date": 1}).batch_size(BULK_WRITE_CHUNK):
             old_date = doc.get("date", "")
             new_date = normalize_date_str(old_date)
             if new_date != old_date:
-                self.collection.update_one(
-                    {"_id": doc["_id"]},
-                    {"$set": {"date": new_date}},
-                )
-                updated += 1
+                fields = {"date": new_date, **self._date_fields(new_date)}
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+            if len(ops) >= BULK_WRITE_CHUNK:
+                updated += self.collection.bulk_write(ops, ordered=False).modified_count
+                ops = []
+        if ops:
+            updated += self.collection.bulk_write(ops, ordered=False).modified_count
+        return updated
+
+    def add_date_fields(self) -> int:
+        """Backfill date_iso and year_month on documents stored without them.
+
+        Dates not yet in DD/MM/YYYY form are read through normalize_date_str;
+        the stored date string is left as is. Returns the number of documents
+        updated.
+        """
+        updated = 0
+        ops: list[UpdateOne] = []
+        query = {"date_iso": {"$exists": False}}
+        for doc in self.collection.find(query, {"date": 1}).batch_size(BULK_WRITE_CHUNK):
+            fields = self._date_fields(normalize_date_str(doc.get("date", "")))
+            if fields:
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+            if len(ops) >= BULK_WRITE_CHUNK:
+                updated += self.collection.bulk_write(ops, ordered=False).modified_count
+                ops = []
+        if ops:
+            updated += self.collection.bulk_write(ops, ordered=False).modified_count
         return updated
 
     @staticmethod
@@ -70,9 +176,34 @@ class ExpenseDB:
         doc["_id"] = str(doc["_id"])
         return doc
 
+    @staticmethod
+    def _debit_query(
+        bank: str | None = None,
+        category: str | None = None,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> dict:
+        """Build the debit query with optional bank/category/date filters.
+
+        Date bounds are inclusive and compared against the indexed date_iso field.
+        """
+        query: dict = {"transaction_type": "debit"}
+        if bank:
+            query["bank"] = bank
+        if category:
+            query["category"] = category
+        date_range = {}
+        if start_date:
+            date_range["$gte"] = start_date
+        if end_date:
+            date_range["$lte"] = end_date
+        if date_range:
+            query["date_iso"] = date_range
+        return query
+
     def get_all_debits(self) -> list[dict]:
         """Return all documents where transaction_type is debit."""
-        return [self._serialize(d) for d in self.collection.find({"transaction_type": "debit"})]
+        return list(self.iter_filtered_expenses())
 
     def get_filtered_expenses(
         self,
@@ -80,24 +211,150 @@ class ExpenseDB:
         category: str | None = None,
     ) -> list[dict]:
         """Return debit expenses with optional bank/category filters."""
-        query: dict = {"transaction_type": "debit"}
-        if bank:
-            query["bank"] = bank
-        if category:
-            query["category"] = category
-        return [self._serialize(d) for d in self.collection.find(query)]
+        return list(self.iter_filtered_expenses(bank=bank, category=category))
+
+    def iter_filtered_expenses(
+        self,
+        bank: str | None = None,
+        category: str | None = None,
+    ) -> Iterator[dict]:
+        """Yield debit expenses with optional bank/category filters.
+
+        Streams from the cursor, decoding each raw BSON batch in a single C call.
+        """
+        query = self._debit_query(bank, category)
+        for batch in self.collection.find_raw_batches(query, batch_size=RAW_BATCH_SIZE):
+            for doc in bson.decode_all(batch):
+                yield self._serialize(doc)
+
+    def get_paginated(
+        self,
+        bank: str | None = None,
+        category: str | None = None,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        sort_by: str = "date",
+        sort_order: str = "desc",
+        skip: int = 0,
+        limit: int = 25,
+    ) -> tuple[list[dict], int]:
+        """Return one sorted page of debit expenses and the total match count.
+
+        sort_by is "amount" or "date" (sorted on date_iso); sorting, skip and
+        limit all run in MongoDB.
+        """
+        query = self._debit_query(bank, category, start_date, end_date)
+        field = "amount" if sort_by == "amount" else "date_iso"
+        direction = DESCENDING if sort_order == "desc" else ASCENDING
+        total = self.collection.count_documents(query)
+        cursor = (
+            self.collection.find(query)
+            .sort([(field, direction), ("_id", ASCENDING)])
+            .skip(skip)
+            .limit(limit)
+        )
+        return [self._serialize(d) for d in cursor], total
 
     def get_distinct_values(self, field: str) -> list[str]:
-        """Return distinct values for a field among debit transactions."""
-        return self.collection.distinct(field, {"transaction_type": "debit"})
+        """Return distinct values for a field among debit transactions.
+
+        Results are cached briefly and invalidated by writes through this handle.
+        """
+        values = self._distinct_cache.get(field)
+        if values is None:
+            values = self.collection.distinct(field, {"transaction_type": "debit"})
+            self._distinct_cache.set(field, values)
+        return values
+
+    def aggregate_monthly_by_bank(self) -> list[dict]:
+        """Return debit totals per (bank, YYYY-MM) month, computed in MongoDB.
+
+        Each row is {"bank": ..., "month": "YYYY-MM", "total_paise": ...}. Groups on
+        the stored year_month field, parsing the date string only for older
+        documents without it; documents with an invalid date are skipped.
+        """
+        parsed_month = {"$dateToString": {
+            "format": "%Y-%m",
+            "date": {"$dateFromString": {
+                "dateString": "$date",
+                "format": "%d/%m/%Y",
+                "onError": None,
+                "onNull": None,
+            }},
+        }}
+        pipeline = [
+            {"$match": {"transaction_type": "debit"}},
+            {"$group": {
+                "_id": {
+                    "bank": "$bank",
+                    "month": {"$ifNull": ["$year_month", parsed_month]},
+                },
+                "total_paise": {"$sum": _AMOUNT_PAISE},
+            }},
+            {"$match": {"_id.month": {"$ne": None}}},
+        ]
+        return [
+            {
+                "bank": row["_id"]["bank"],
+                "month": row["_id"]["month"],
+                "total_paise": row["total_paise"],
+            }
+            for row in self.collection.aggregate(pipeline)
+        ]
+
+    def aggregate_debits_by_category(
+        self,
+        bank: str | None = None,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> list[dict]:
+        """Return debit totals and counts per category, largest total first.
+
+        Each row is {"category": ..., "total_paise": ..., "count": ...}; documents
+        without a category are grouped under "other".
+        """
+        pipeline = [
+            {"$match": self._debit_query(bank=bank, start_date=start_date, end_date=end_date)},
+            {"$group": {
+                "_id": {"$ifNull": ["$category", "other"]},
+                "total_paise": {"$sum": _AMOUNT_PAISE},
+                "count": {"$sum": 1},
+            }},
+            {"$sort": {"total_paise": -1}},
+        ]
+        return [
+            {"category": row["_id"], "total_paise": row["total_paise"], "count": row["count"]}
+            for row in self.collection.aggregate(pipeline)
+        ]
 
-    def search_by_description(self, description: str) -> list[dict]:
-        """Return debit expenses whose description contains the given substring (case-insensitive)."""
-        query = {
-            "transaction_type": "debit",
-            "description": {"$regex": description, "$options": "i"},
-        }
-        return [self._serialize(d) for d in self.collection.find(query)]
+    def search_by_description(self, description: str, regex: bool = False) -> list[dict]:
+        """Return debit expenses whose description matches the given words.
+
+        By default this uses the text index on description: matching is
+        case-insensitive and word-based (stemmed), and results are ordered by
+        relevance. Pass regex=True for a case-insensitive substring match
+        instead, which finds partial words but scans every debit document.
+        """
+        if regex:
+            query = {
+                "transaction_type": "debit",
+                "description": {"$regex": re.escape(description), "$options": "i"},
+            }
+            cursor = self.collection.find(query)
+        else:
+            query = {
+                "transaction_type": "debit",
+                "$text": {"$search": description},
+            }
+            # Servers before MongoDB 4.4 can only sort on textScore if it is
+            # projected; drop it again so the documents keep their shape.
+            score = {"score": {"$meta": "textScore"}}
+            cursor = self.collection.find(query, score).sort([("score", {"$meta": "textScore"})])
+        docs = []
+        for doc in cursor.batch_size(CURSOR_BATCH_SIZE):
+            doc.pop("score", None)
+            docs.append(self._serialize(doc))
+        return docs
 
     def update_expense(self, expense_id: str, updates: dict) -> bool:
         """Update specific fields of an expense by its _id.
@@ -108,8 +365,11 @@ class ExpenseDB:
             {"_id": ObjectId(expense_id)},
             {"$set": updates},
         )
+        self._distinct_cache.clear()
         return result.modified_count > 0
 
     def close(self) -> None:
-        """Close the MongoDB connection."""
-        self.client.close()
+        """Release this handle.
+
+        The underlying MongoClient is shared process-wide and stays open.
+        """
@@ -1,10 +1,19 @@
 """Email search logic for bank-specific credit card statements."""
 
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional
 
-from .gmail_client import GmailClient
+from .gmail_client import HEADER_FIELDS, GmailClient
+
+logger = logging.getLogger(__name__)
+
+# Decides whether to skip a message before its full payload is fetched. Called
+# with the partial message (headers plus attachment filenames, HEADER_FIELDS)
+# and the bank key.
+SkipPredicate = Callable[[dict, str], bool]
 
 
 @dataclass
@@ -67,44 +76,84 @@ class EmailSearcher:
         since_date: Optional[datetime] = None,
         to_date: Optional[datetime] = None,
         max_results: int = 100,
+        skip_predicate: Optional[SkipPredicate] = None,
     ) -> list[EmailResult]:
-        """Search for credit card statements from specified bank(s)."""
+        """Search for credit card statements from specified bank(s).
+
+        Banks are searched concurrently; results keep the bank order.
+
+        If skip_predicate is given, it is called with each message's partial
+        message (headers plus attachment filenames, HEADER_FIELDS; fetched in
+        batches) and the bank key. Messages for which it returns True are
+        dropped before their full payload is fetched. Attachments nested deeper
+        than three MIME levels are not included, so the predicate can't see them.
+        """
         results = []
 
         banks_to_search = [bank] if bank else list(BANK_CONFIGS.keys())
 
-        for bank_key in banks_to_search:
-            if bank_key not in BANK_CONFIGS:
-                print(f"Unknown bank: {bank_key}")
-                continue
+        # The date filter is the same for every bank, so build it once.
+        date_filter = ""
+        if since_date:
+            date_filter += f" after:{since_date.strftime('%Y/%m/%d')}"
+        if to_date:
+            date_filter += f" before:{to_date.strftime('%Y/%m/%d')}"
+
+        with ThreadPoolExecutor(max_workers=len(banks_to_search)) as executor:
+            futures = [
+                executor.submit(
+                    self._search_one_bank, bank_key, date_filter, max_results, skip_predicate
+                )
+                for bank_key in banks_to_search
+            ]
+            for future in futures:
+                results.extend(future.result())
+
+        return results
+
+    def _search_one_bank(
+        self,
+        bank_key: str,
+        date_filter: str,
+        max_results: int,
+        skip_predicate: Optional[SkipPredicate] = None,
+    ) -> list[EmailResult]:
+        """Search and parse statement emails for a single bank."""
+        if bank_key not in BANK_CONFIGS:
+            logger.warning("Unknown bank: %s", bank_key)
+            return []
 
-            config = BANK_CONFIGS[bank_key]
-            query = config.search_query
+        config = BANK_CONFIGS[bank_key]
+        query = config.search_query + date_filter
 
-            if since_date:
-                date_str = since_date.strftime("%Y/%m/%d")
-                query += f" after:{date_str}"
+        messages = self.client.search_messages(query, max_results)
+        logger.info("Found %d emails from %s", len(messages), config.name)
 
-            if to_date:
-                date_str = to_date.strftime("%Y/%m/%d")
-                query += f" before:{date_str}"
+        if skip_predicate and messages:
+            headers = self.client.get_messages([m["id"] for m in messages], fields=HEADER_FIELDS)
+            messages = [
+                m for m in messages
+                if m["id"] not in headers or not skip_predicate(headers[m["id"]], bank_key)
+            ]
 
-            messages = self.client.search_messages(query, max_results)
-            print(f"Found {len(messages)} emails from {config.name}")
+        fetched = self.client.get_messages([m["id"] for m in messages])
 
-            for msg_info in messages:
-                try:
-                    email_result = self._parse_message(msg_info["id"], bank_key)
-                    if email_result:
-                        results.append(email_result)
-                except Exception as e:
-                    print(f"Error parsing message {msg_info['id']}: {e}")
+        results = []
+        for msg_info in messages:
+            message = fetched.get(msg_info["id"])
+            if message is None:
+                continue
+            try:
+                email_result = self._parse_message(message, bank_key)
+                if email_result:
+                    results.append(email_result)
+            except Exception as e:
+                logger.error("Error parsing message %s: %s", msg_info["id"], e)
 
         return results
 
-    def _parse_message(self, message_id: str, bank: str) -> Optional[EmailResult]:
-        """Parse a Gmail message into EmailResult."""
-        message = self.client.get_message(message_id)
+    def _parse_message(self, message: dict, bank: str) -> Optional[EmailResult]:
+        """Parse a fetched Gmail message into EmailResult."""
         payload = message.get("payload", {})
         headers = {h["name"].lower(): h["value"] for h in payload.get("headers", [])}
 
@@ -114,8 +163,7 @@ class EmailSearcher:
 
         date = self._parse_date(date_str)
 
-        body_text, body_html = self._extract_body(payload)
-        attachments = self._extract_attachments(payload)
+        body_text, body_html, attachments = self._walk_payload(payload)
 
         pdf_attachments = [a for a in attachments if a["filename"].lower().endswith(".pdf")]
 
@@ -123,7 +171,7 @@ class EmailSearcher:
             return None
 
         return EmailResult(
-            message_id=message_id,
+            message_id=message["id"],
             bank=bank,
             subject=subject,
             date=date,
@@ -142,36 +190,22 @@ class EmailSearcher:
         except Exception:
             return datetime.now()
 
-    def _extract_body(self, payload: dict) -> tuple[str, str]:
-        """Extract plain text and HTML body from message payload."""
+    def _walk_payload(self, payload: dict) -> tuple[str, str, list[dict]]:
+        """Extract plain text body, HTML body and attachments in one pass.
+
+        Walks the MIME tree depth-first in document order; for repeated
+        text parts the last one wins.
+        """
         import base64
 
         body_text = ""
         body_html = ""
-
-        def extract_from_part(part: dict) -> None:
-            nonlocal body_text, body_html
-            mime_type = part.get("mimeType", "")
-            body = part.get("body", {})
-
-            if "data" in body:
-                data = base64.urlsafe_b64decode(body["data"]).decode("utf-8", errors="ignore")
-                if mime_type == "text/plain":
-                    body_text = data
-                elif mime_type == "text/html":
-                    body_html = data
-
-            for sub_part in part.get("parts", []):
-                extract_from_part(sub_part)
-
-        extract_from_part(payload)
-        return body_text, body_html
-
-    def _extract_attachments(self, payload: dict) -> list[dict]:
-        """Extract attachment information from message payload."""
         attachments = []
 
-        def extract_from_part(part: dict) -> None:
+        stack = [payload]
+        while stack:
+            part = stack.pop()
+            mime_type = part.get("mimeType", "")
             filename = part.get("filename", "")
             body = part.get("body", {})
             attachment_id = body.get("attachmentId")
@@ -182,12 +216,14 @@ class EmailSearcher:
                         "filename": filename,
                         "attachment_id": attachment_id,
                         "size": body.get("size", 0),
-                        "mime_type": part.get("mimeType", ""),
+                        "mime_type": mime_type,
                     }
                 )
+            elif mime_type == "text/plain" and "data" in body:
+                body_text = base64.urlsafe_b64decode(body["data"]).decode("utf-8", errors="ignore")
+            elif mime_type == "text/html" and "data" in body:
+                body_html = base64.urlsafe_b64decode(body["data"]).decode("utf-8", errors="ignore")
 
-            for sub_part in part.get("parts", []):
-                extract_from_part(sub_part)
+            stack.extend(reversed(part.get("parts", [])))
 
-        extract_from_part(payload)
-        return attachments
+        return body_text, body_html, attachments
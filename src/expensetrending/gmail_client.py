@@ -11,17 +11,44 @@ For better security and portability we now prefer a per-user cache directory:
 We keep a backward-compatible fallback to the legacy repo location.
 """
 
+import logging
 import os
+import threading
+import time
 from pathlib import Path
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from google.auth.exceptions import RefreshError
 
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 
+# Gmail accepts up to 100 calls per batch but recommends at most 50; larger
+# batches tend to hit per-user rate limits.
+BATCH_SIZE = 50
+# Batched calls that fail with 429 or 5xx are retried with exponential backoff.
+BATCH_MAX_RETRIES = 4
+BATCH_RETRY_BASE_SECONDS = 1.0
+
+# Partial-response field masks: only what EmailSearcher reads.
+LIST_FIELDS = "messages/id,nextPageToken"
+MESSAGE_FIELDS = "id,payload(mimeType,filename,headers,body,parts)"
+# Headers plus attachment filenames (three MIME levels deep), enough to tell
+# whether a message's PDFs are already on disk.
+HEADER_FIELDS = (
+    "id,payload(filename,headers,parts(filename,parts(filename,parts(filename))))"
+)
+
+# Avoid re-fetching the same message within a run.
+CACHE_TTL_SECONDS = 300
+
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 CREDENTIALS_DIR = PROJECT_ROOT / "credentials"
 CREDENTIALS_PATH = CREDENTIALS_DIR / "credentials.json"
@@ -56,12 +83,27 @@ def _legacy_token_path() -> Path:
     return CREDENTIALS_DIR / "token.json"
 
 
+def _is_retryable(exception: Exception) -> bool:
+    """Return True for rate-limit (429), server-side (5xx) and transport errors."""
+    if isinstance(exception, OSError):
+        return True
+    if not isinstance(exception, HttpError):
+        return False
+    status = exception.resp.status
+    return status == 429 or status >= 500
+
+
 class GmailClient:
     """Client for interacting with Gmail API."""
 
     def __init__(self):
         self._service = None
         self._credentials = None
+        # httplib2 is not thread-safe, so worker threads get their own service.
+        self._local = threading.local()
+        # Serializes the lazy authenticate() when several threads start at once.
+        self._auth_lock = threading.Lock()
+        self._msg_cache = TTLCache(maxsize=1024, ttl=CACHE_TTL_SECONDS)
 
     def authenticate(self) -> None:
         """Authenticate with Gmail using OAuth2."""
@@ -116,12 +158,28 @@ class GmailClient:
 
     def get_service(self):
         """Get the Gmail API service instance."""
+        if threading.current_thread() is not threading.main_thread():
+            return self._get_thread_service()
         if self._service is None:
-            if self._credentials is None:
-                self.authenticate()
+            self._ensure_authenticated()
             self._service = build("gmail", "v1", credentials=self._credentials)
         return self._service
 
+    def _ensure_authenticated(self) -> None:
+        """Authenticate on first use; safe to call from any thread."""
+        with self._auth_lock:
+            if self._credentials is None:
+                self.authenticate()
+
+    def _get_thread_service(self):
+        """Get a Gmail API service instance private to the calling thread."""
+        service = getattr(self._local, "service", None)
+        if service is None:
+            self._ensure_authenticated()
+            service = build("gmail", "v1", credentials=self._credentials)
+            self._local.service = service
+        return service
+
     def search_messages(self, query: str, max_results: int = 100) -> list[dict]:
         """Search for messages matching the query."""
         service = self.get_service()
@@ -137,6 +195,7 @@ class GmailClient:
                     q=query,
                     maxResults=min(max_results - len(messages), 100),
                     pageToken=page_token,
+                    fields=LIST_FIELDS,
                 )
                 .execute()
             )
@@ -153,15 +212,84 @@ class GmailClient:
 
         return messages[:max_results]
 
-    def get_message(self, message_id: str) -> dict:
-        """Get a specific message by ID."""
+    def get_message(self, message_id: str, fields: str = MESSAGE_FIELDS) -> dict:
+        """Get a specific message by ID, limited to the given field mask."""
+        key = (message_id, fields)
+        message = self._msg_cache.get(key)
+        if message is None:
+            service = self.get_service()
+            message = (
+                service.users()
+                .messages()
+                .get(userId="me", id=message_id, format="full", fields=fields)
+                .execute()
+            )
+            self._msg_cache.set(key, message)
+        return message
+
+    def get_messages(self, ids: list[str], fields: str = MESSAGE_FIELDS) -> dict[str, dict]:
+        """Get several messages by ID using batched HTTP requests.
+
+        Returns a dict keyed by message ID. Calls or whole batches that are
+        rate limited or hit a server or transport error are retried with
+        backoff; messages that still fail are reported and left out of the
+        result.
+        """
         service = self.get_service()
-        return (
-            service.users()
-            .messages()
-            .get(userId="me", id=message_id, format="full")
-            .execute()
-        )
+        messages: dict[str, dict] = {}
+        pending = []
+        for message_id in ids:
+            cached = self._msg_cache.get((message_id, fields))
+            if cached is None:
+                pending.append(message_id)
+            else:
+                messages[message_id] = cached
+
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            retry: list[str] = []
+
+            def callback(request_id: str, response: dict, exception: Exception) -> None:
+                if exception is not None:
+                    if attempt < BATCH_MAX_RETRIES and _is_retryable(exception):
+                        retry.append(request_id)
+                    else:
+                        logger.error("Error fetching message %s: %s", request_id, exception)
+                    return
+                messages[request_id] = response
+                self._msg_cache.set((request_id, fields), response)
+
+            for start in range(0, len(pending), BATCH_SIZE):
+                chunk = pending[start:start + BATCH_SIZE]
+                batch = service.new_batch_http_request(callback=callback)
+                for message_id in chunk:
+                    batch.add(
+                        service.users()
+                        .messages()
+                        .get(userId="me", id=message_id, format="full", fields=fields),
+                        request_id=message_id,
+                    )
+                try:
+                    batch.execute()
+                except (HttpError, OSError) as e:
+                    # The whole batch failed; its calls may not have reached the callback.
+                    unresolved = [
+                        m for m in chunk if m not in messages and m not in retry
+                    ]
+                    if attempt < BATCH_MAX_RETRIES and _is_retryable(e):
+                        retry.extend(unresolved)
+                    else:
+                        logger.error(
+                            "Error fetching %d message(s) in batch: %s", len(unresolved), e
+                        )
+
+            if not retry:
+                break
+            delay = BATCH_RETRY_BASE_SECONDS * 2 ** attempt
+            logger.warning("Retrying %d message(s) in %.0fs", len(retry), delay)
+            time.sleep(delay)
+            pending = retry
+
+        return messages
 
     def get_attachment(self, message_id: str, attachment_id: str) -> bytes:
         """Download an attachment."""
@@ -1,7 +1,9 @@
 """CLI entry point for ExpenseTrending."""
 
 import argparse
+import logging
 from datetime import datetime
+from email.utils import parsedate_to_datetime
 from getpass import getpass
 from pathlib import Path
 from typing import Optional
@@ -10,7 +12,13 @@ from .attachment_handler import AttachmentHandler, RESOURCES_DIR
 from .db_handler import ExpenseDB
 from .email_searcher import BANK_CONFIGS, EmailSearcher
 from .gmail_client import GmailClient
-from .statement_parser import StatementParser
+# Aliased: run_download has a parse_statements flag.
+from .statement_parser import ExpenseItem, parse_statements as parse_statement_files
+
+# Expenses per insert_many call when flushing parsed statements to MongoDB.
+SAVE_BATCH_SIZE = 100
+
+logger = logging.getLogger(__name__)
 
 
 def parse_date(date_str: str) -> datetime:
@@ -28,6 +36,15 @@ def get_bank_passwords(banks: list[str]) -> None:
             config.password = password
 
 
+def _parse_files(jobs: list[tuple[Path, str]]) -> list[ExpenseItem]:
+    """Parse (pdf_path, bank) jobs across processes and flatten the results."""
+    all_expenses: list[ExpenseItem] = []
+    for (pdf_path, _), expenses in zip(jobs, parse_statement_files(jobs)):
+        logger.info("  Parsed %d transactions from %s", len(expenses), pdf_path.name)
+        all_expenses.extend(expenses)
+    return all_expenses
+
+
 def run_download(
     bank: Optional[str] = None,
     since_date: Optional[datetime] = None,
@@ -36,6 +53,7 @@ def run_download(
     dry_run: bool = False,
     parse_statements: bool = False,
     flush_db: bool = False,
+    fast_insert: bool = False,
 ) -> None:
     """Run the statement download process."""
     print("Initializing Gmail client...")
@@ -55,17 +73,37 @@ def run_download(
     # Initialize database if parsing
     db = None
     if parse_statements:
-        db = ExpenseDB()
+        db = ExpenseDB(fast_insert=fast_insert)
         if flush_db:
             deleted = db.flush_collection()
             print(f"\nFlushed {deleted} existing records from database.")
 
+    def already_downloaded(message: dict, bank_key: str) -> bool:
+        payload = message.get("payload", {})
+        headers = payload.get("headers", [])
+        date_str = next((h["value"] for h in headers if h["name"].lower() == "date"), "")
+        try:
+            date = parsedate_to_datetime(date_str)
+        except (TypeError, ValueError):
+            return False
+        pdf_names = []
+        parts = [payload]
+        while parts:
+            part = parts.pop()
+            if part.get("filename", "").lower().endswith(".pdf"):
+                pdf_names.append(part["filename"])
+            parts.extend(part.get("parts", []))
+        return attachment_handler.has_downloads_for(bank_key, date, pdf_names)
+
     print("\nSearching for credit card statements...")
     emails = searcher.search_bank_statements(
         bank=bank,
         since_date=since_date,
         to_date=to_date,
         max_results=max_results,
+        # Parsing needs the already-downloaded files back, so only skip
+        # them on plain download runs.
+        skip_predicate=None if parse_statements else already_downloaded,
     )
 
     print(f"\nFound {len(emails)} emails with PDF attachments.")
@@ -73,21 +111,17 @@ def run_download(
     total_saved = 0
 
     for email in emails:
-        print(f"\nProcessing: {email.subject}")
-        print(f"  Bank: {email.bank.upper()}")
-        print(f"  Date: {email.date.strftime('%Y-%m-%d')}")
-
-        downloaded_files = attachment_handler.download_attachments(email, dry_run=dry_run)
-
-        if parse_statements and not dry_run and db:
-            parser = StatementParser(email.bank)
-            for pdf_path in downloaded_files:
-                print(f"  Parsing: {pdf_path.name}")
-                expenses = parser.parse_pdf(pdf_path)
-                if expenses:
-                    saved = db.save_expenses(expenses)
-                    total_saved += saved
-                    print(f"  Saved {saved} transactions to database")
+        logger.info("\nProcessing: %s", email.subject)
+        logger.info("  Bank: %s", email.bank.upper())
+        logger.info("  Date: %s", email.date.strftime("%Y-%m-%d"))
+
+    print("\nDownloading attachments...")
+    downloaded = attachment_handler.download_many(emails, dry_run=dry_run)
+
+    if parse_statements and not dry_run and db:
+        jobs = [(pdf_path, email.bank) for email, pdf_path in downloaded]
+        all_expenses = _parse_files(jobs)
+        total_saved = db.save_expenses_bulk(all_expenses, batch_size=SAVE_BATCH_SIZE)
 
     if parse_statements and db:
         print(f"\nTotal: {total_saved} transactions saved to MongoDB")
@@ -100,6 +134,7 @@ def run_parse_only(
     bank: Optional[str] = None,
     pdf_path: Optional[str] = None,
     flush_db: bool = False,
+    fast_insert: bool = False,
 ) -> None:
     """Parse existing PDF statements without downloading."""
     # Determine which banks to parse
@@ -109,13 +144,13 @@ def run_parse_only(
     get_bank_passwords(banks_to_parse)
 
     # Initialize database
-    db = ExpenseDB()
+    db = ExpenseDB(fast_insert=fast_insert)
     if flush_db:
         deleted = db.flush_collection()
         print(f"\nFlushed {deleted} existing records from database.")
 
     resources_path = Path(RESOURCES_DIR)
-    total_saved = 0
+    jobs: list[tuple[Path, str]] = []
 
     if pdf_path:
         # Parse specific PDF
@@ -134,13 +169,8 @@ def run_parse_only(
         if not bank_key:
             bank_key = bank or "hdfc"  # Default to hdfc if can't determine
 
-        parser = StatementParser(bank_key)
-        print(f"Parsing: {pdf_file.name} (bank: {bank_key})")
-        expenses = parser.parse_pdf(pdf_file)
-        if expenses:
-            saved = db.save_expenses(expenses)
-            total_saved += saved
-            print(f"  Saved {saved} transactions to database")
+        logger.info("Parsing: %s (bank: %s)", pdf_file.name, bank_key)
+        jobs.append((pdf_file, bank_key))
     else:
         # Parse all PDFs in resources directory
         for bank_key in banks_to_parse:
@@ -148,18 +178,13 @@ def run_parse_only(
             pdf_files = list(resources_path.glob(pattern))
 
             if not pdf_files:
-                print(f"No PDFs found for {bank_key}")
+                logger.info("No PDFs found for %s", bank_key)
                 continue
 
-            parser = StatementParser(bank_key)
-            for pdf_file in pdf_files:
-                print(f"Parsing: {pdf_file.name}")
-                expenses = parser.parse_pdf(pdf_file)
-                if expenses:
-                    saved = db.save_expenses(expenses)
-                    total_saved += saved
-                    print(f"  Saved {saved} transactions to database")
+            jobs.extend((pdf_file, bank_key) for pdf_file in pdf_files)
 
+    all_expenses = _parse_files(jobs)
+    total_saved = db.save_expenses_bulk(all_expenses, batch_size=SAVE_BATCH_SIZE)
     print(f"\nTotal: {total_saved} transactions saved to MongoDB")
     db.close()
 
@@ -235,14 +260,33 @@ def main() -> None:
         help="Flush (clear) the database collection before saving (default: no flush)",
     )
 
+    parser.add_argument(
+        "--fast-insert",
+        action="store_true",
+        default=False,
+        help="Save transactions with unacknowledged writes (faster, but insert errors are not reported)",
+    )
+
     parser.add_argument(
         "--normalize-dates",
         action="store_true",
         help="Migrate all dates in MongoDB to DD/MM/YYYY format and exit",
     )
 
+    parser.add_argument(
+        "--add-date-fields",
+        action="store_true",
+        help="Backfill indexed date_iso/year_month fields on existing records and exit",
+    )
+
     args = parser.parse_args()
 
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
     if args.normalize_dates:
         db = ExpenseDB()
         updated = db.normalize_dates()
@@ -250,6 +294,13 @@ def main() -> None:
         db.close()
         return
 
+    if args.add_date_fields:
+        db = ExpenseDB()
+        updated = db.add_date_fields()
+        print(f"Added date fields to {updated} record(s).")
+        db.close()
+        return
+
     if args.list_banks:
         print("Supported banks:")
         for key, config in BANK_CONFIGS.items():
@@ -261,6 +312,7 @@ def main() -> None:
             bank=args.bank,
             pdf_path=args.pdf,
             flush_db=args.flush,
+            fast_insert=args.fast_insert,
         )
     else:
         run_download(
@@ -271,6 +323,7 @@ def main() -> None:
             dry_run=args.dry_run,
             parse_statements=args.parse,
             flush_db=args.flush,
+            fast_insert=args.fast_insert,
         )
 
 
@@ -1,15 +1,28 @@
 """Parse credit card statements from PDF files."""
 
 import json
+import logging
+import multiprocessing
+import os
 import re
-from dataclasses import dataclass, asdict
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime
 from pathlib import Path
+from typing import Iterator, Optional
 
 from pypdf import PdfReader
 
 from .email_searcher import BANK_CONFIGS
 
+logger = logging.getLogger(__name__)
+
+# Set EXPENSETRENDING_USE_PDFIUM=1 to extract text with pypdfium2 (optional,
+# much faster than pypdf). Falls back to pypdf when it is not installed.
+USE_PDFIUM = os.environ.get("EXPENSETRENDING_USE_PDFIUM", "") not in ("", "0")
+
 
 # Category keywords for expense classification
 CATEGORY_KEYWORDS = {
@@ -74,6 +87,33 @@ CATEGORY_KEYWORDS = {
 }
 
 
+# Transaction line patterns, compiled once at import. Descriptions use `.`,
+# which never crosses a line break. The whitespace and digit runs leading into
+# the amount are possessive, since backtracking into them can never produce a
+# match.
+# HDFC format 1 (older): DD/MM/YYYY| HH:MM DESCRIPTION C/D AMOUNT
+_HDFC_P1 = re.compile(r'(\d{2}/\d{2}/\d{4})\|\s*\d{2}:\d{2}\s+(.+?)\s+([CD])\s++([\d,]++\.\d{2})')
+# HDFC format 2 (newer): DD/MM/YYYY [HH:MM:SS] DESCRIPTION [REWARD_PTS] AMOUNT [Cr]
+_HDFC_P2 = re.compile(
+    r'(\d{2}/\d{2}/\d{4})(?:\s+\d{2}:\d{2}:\d{2})?\s+(.+?)\s++([\d,]++\.\d{2})(\s+Cr)?\s*$',
+    re.MULTILINE,
+)
+_SBI = re.compile(r'(\d{2}\s+\w{3}\s+\d{2})\s+(.+?)\s++([\d,]++\.\d{2})\s+([MDC])')
+_IDFC = [
+    re.compile(r'(\d{2}\s+\w{3}\s+\d{2})\s+(.+?)\s++([\d,]++\.\d{2})\s+(CR|DR)', re.IGNORECASE),
+    re.compile(r'(\d{2}/\d{2}/\d{4})\s+(.+?)\s++([\d,]++\.\d{2})\s+(CR|DR)', re.IGNORECASE),
+]
+_GENERIC = [
+    re.compile(r'(\d{2}/\d{2}/\d{4})\s+(.+?)\s++([\d,]++\.\d{2})'),
+    re.compile(r'(\d{2}-\d{2}-\d{4})\s+(.+?)\s++([\d,]++\.\d{2})'),
+    re.compile(r'(\d{2}\s+\w{3}\s+\d{4})\s+(.+?)\s++([\d,]++\.\d{2})'),
+]
+# Trailing reward points left in HDFC descriptions ("+ 12" in format 1, "16" in format 2)
+_REWARD1 = re.compile(r'\s*\+\s*\d+$')
+_REWARD2 = re.compile(r'\s+-?\d+$')
+_WS = re.compile(r'\s+')
+
+
 DATE_FORMATS = [
     "%d/%m/%Y",
     "%d-%m-%Y",
@@ -82,12 +122,67 @@ DATE_FORMATS = [
 ]
 
 
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+
+def parse_ddmmyyyy(date_str: str) -> datetime | None:
+    """Parse a DD/MM/YYYY string without strptime.
+
+    Returns None if the string is not exactly in that shape or is not a
+    real calendar date.
+    """
+    s = date_str
+    if len(s) != 10 or s[2] != "/" or s[5] != "/" or not s.isascii():
+        return None
+    day, month, year = s[0:2], s[3:5], s[6:10]
+    if not (day.isdigit() and month.isdigit() and year.isdigit()):
+        return None
+    try:
+        return datetime(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def _fast_normalize(cleaned: str) -> str | None:
+    """Normalize the common date shapes by slicing; None means use strptime."""
+    if not cleaned.isascii():
+        return None
+    n = len(cleaned)
+    if n == 10 and cleaned[2] == cleaned[5] and cleaned[2] in "/-":
+        day, month, year = cleaned[0:2], cleaned[3:5], cleaned[6:10]
+    elif n in (9, 11) and cleaned[2] == " " and cleaned[6] == " ":
+        day, year = cleaned[0:2], cleaned[7:]
+        month_num = _MONTHS.get(cleaned[3:6].lower())
+        if month_num is None:
+            return None
+        month = str(month_num)
+        if n == 9 and year.isdigit():
+            # Same pivot as strptime's %y: 69-99 -> 19xx, 00-68 -> 20xx.
+            year = str(int(year) + (1900 if int(year) >= 69 else 2000))
+    else:
+        return None
+    if not (day.isdigit() and month.isdigit() and year.isdigit()) or int(year) < 1000:
+        return None
+    try:
+        dt = datetime(int(year), int(month), int(day))
+    except ValueError:
+        return None
+    return f"{dt.day:02d}/{dt.month:02d}/{dt.year}"
+
+
+@lru_cache(maxsize=4096)
 def normalize_date_str(date_str: str) -> str:
     """Convert any supported date format to DD/MM/YYYY.
 
     Returns the original string if parsing fails.
     """
-    cleaned = re.sub(r"\s+", " ", date_str.strip())
+    cleaned = _WS.sub(" ", date_str.strip())
+    fast = _fast_normalize(cleaned)
+    if fast is not None:
+        return fast
     for fmt in DATE_FORMATS:
         try:
             dt = datetime.strptime(cleaned, fmt)
@@ -97,16 +192,23 @@ def normalize_date_str(date_str: str) -> str:
     return date_str
 
 
-CATEGORY_PATTERNS = {
-    cat: re.compile("|".join(re.escape(kw) for kw in keywords), re.IGNORECASE)
-    for cat, keywords in CATEGORY_KEYWORDS.items()
-}
+# (keyword, category) pairs flattened in CATEGORY_KEYWORDS priority order.
+# Plain substring tests on the lowercased description are several times
+# faster than running one case-insensitive regex per category.
+_KEYWORD_TABLE = tuple(
+    (kw.lower(), cat) for cat, keywords in CATEGORY_KEYWORDS.items() for kw in keywords
+)
 
 
+@lru_cache(maxsize=4096)
 def categorize_expense(description: str) -> str:
-    """Categorize an expense based on its description."""
-    for category, pattern in CATEGORY_PATTERNS.items():
-        if pattern.search(description):
+    """Categorize an expense based on its description.
+
+    Results are memoized since merchant descriptions repeat across statements.
+    """
+    desc_lower = description.lower()
+    for keyword, category in _KEYWORD_TABLE:
+        if keyword in desc_lower:
             return category
 
     return "other"
@@ -121,32 +223,55 @@ class ExpenseItem:
     transaction_type: str  # "debit" or "credit"
     bank: str
     category: str
+    amount_paise: int | None = None  # exact integer amount, derived from amount
+
+    def __post_init__(self) -> None:
+        if self.amount_paise is None:
+            self.amount_paise = round(self.amount * 100)
 
     def to_json(self) -> str:
-        return json.dumps(asdict(self), indent=2)
+        # Every field is a plain str/float/int, so the instance dict serializes
+        # as-is without asdict()'s recursive deep copy.
+        return json.dumps(vars(self), indent=2)
+
+
+def _make_expense(
+    date_str: str, description: str, amount_str: str, is_credit: bool, bank: str
+) -> ExpenseItem:
+    """Build an ExpenseItem from a matched "1,234.56" amount.
+
+    The statement patterns only capture digits and commas followed by exactly
+    two decimals, so the amount is read as integer paise without float()
+    and can't fail to parse.
+    """
+    paise = int(amount_str.replace(",", "").replace(".", ""))
+    return ExpenseItem(
+        date=date_str,
+        description=description,
+        amount=paise / 100,
+        transaction_type="credit" if is_credit else "debit",
+        bank=bank,
+        category=categorize_expense(description),
+        amount_paise=paise,
+    )
 
 
 class StatementParser:
     """Parse credit card statements from different banks."""
 
-    def __init__(self, bank: str):
+    def __init__(self, bank: str, password: Optional[str] = None):
         self.bank = bank
-        self.password = BANK_CONFIGS.get(bank, {}).password if bank in BANK_CONFIGS else ""
+        if password is None:
+            password = BANK_CONFIGS[bank].password if bank in BANK_CONFIGS else ""
+        self.password = password
 
     def parse_pdf(self, pdf_path: Path) -> list[ExpenseItem]:
         """Parse a PDF statement and extract expense items."""
         try:
-            reader = PdfReader(pdf_path)
-
-            if reader.is_encrypted:
-                if not self.password:
-                    print(f"  PDF is encrypted but no password set for {self.bank}")
-                    return []
-                reader.decrypt(self.password)
-
-            full_text = ""
-            for page in reader.pages:
-                full_text += page.extract_text() + "\n"
+            pages = self._iter_page_text(pdf_path)
+            if pages is None:
+                return []
+            full_text = "".join(f"{text}\n" for text in pages)
 
             # Parse based on bank format
             if self.bank == "hdfc":
@@ -159,176 +284,158 @@ class StatementParser:
                 return self._parse_generic_statement(full_text)
 
         except Exception as e:
-            print(f"  Error parsing PDF {pdf_path.name}: {e}")
+            logger.error("  Error parsing PDF %s: %s", pdf_path.name, e)
             return []
 
+    def _iter_page_text(self, pdf_path: Path) -> Optional[Iterator[str]]:
+        """Return a generator of page texts, or None if the PDF can't be opened.
+
+        Pages are extracted one at a time as the generator is consumed, so
+        only the text (not the decoded pages) is held in memory.
+        """
+        if USE_PDFIUM:
+            try:
+                import pypdfium2 as pdfium
+            except ImportError:
+                logger.warning("  pypdfium2 is not installed, falling back to pypdf")
+            else:
+                return self._iter_page_text_pdfium(pdfium, pdf_path)
+
+        reader = PdfReader(pdf_path)
+        if reader.is_encrypted:
+            if not self.password:
+                logger.warning("  PDF is encrypted but no password set for %s", self.bank)
+                return None
+            reader.decrypt(self.password)
+        return (page.extract_text() for page in reader.pages)
+
+    def _iter_page_text_pdfium(self, pdfium, pdf_path: Path) -> Iterator[str]:
+        """Yield page texts using pypdfium2's native text extraction."""
+        pdf = pdfium.PdfDocument(pdf_path, password=self.password or None)
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                try:
+                    yield textpage.get_text_range()
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+
     def _parse_hdfc_statement(self, text: str) -> list[ExpenseItem]:
-        """Parse HDFC Bank credit card statement."""
-        expenses = []
+        """Parse HDFC Bank credit card statement.
 
+        Patterns run over the whole text rather than line by line, since
+        extracted rows can wrap the time, amount or "Cr" onto the next line.
+        """
         # Format 1 (older): DD/MM/YYYY| HH:MM DESCRIPTION C/D AMOUNT
         # Example: 19/10/2025| 15:28 ANAND SWEETS AND SAVOURBANGALORE C 2,250.00
         # C = Charge (debit), D = Credit (refund)
-        pattern1 = r'(\d{2}/\d{2}/\d{4})\|\s*\d{2}:\d{2}\s+(.+?)\s+([CD])\s+([\d,]+\.\d{2})'
-
-        for match in re.finditer(pattern1, text):
-            date_str = match.group(1)
-            description = match.group(2).strip()
-            description = re.sub(r'\s*\+\s*\d+$', '', description).strip()
-            txn_type = match.group(3)
-            amount_str = match.group(4).replace(',', '')
-
-            try:
-                amount = float(amount_str)
-                expenses.append(ExpenseItem(
-                    date=date_str,
-                    description=description,
-                    amount=amount,
-                    transaction_type="credit" if txn_type == 'D' else "debit",
-                    bank="hdfc",
-                    category=categorize_expense(description)
-                ))
-            except ValueError:
-                continue
-
-        if expenses:
-            return expenses
+        # Every format 1 row has a "|" after the date; skip the scan when none do.
+        if "|" in text:
+            expenses = [
+                _make_expense(
+                    date_str, _REWARD1.sub('', description.strip()).strip(), amount_str,
+                    flag == 'D', "hdfc",
+                )
+                for date_str, description, flag, amount_str in _HDFC_P1.findall(text)
+            ]
+            if expenses:
+                return expenses
 
         # Format 2 (newer): DD/MM/YYYY [HH:MM:SS] DESCRIPTION [REWARD_PTS] AMOUNT [Cr]
         # Example: 20/06/2025 11:53:21 RXDX WHITEFIELD RECEPTBENGALURU 16 650.00
         # Example: 02/07/2025 10:26:34 NETBANKING TRANSFER (Ref# ...) 45,741.62 Cr
-        pattern2 = r'(\d{2}/\d{2}/\d{4})(?:\s+\d{2}:\d{2}:\d{2})?\s+(.+?)\s+([\d,]+\.\d{2})(\s+Cr)?\s*$'
-
-        for match in re.finditer(pattern2, text, re.MULTILINE):
-            date_str = match.group(1)
-            description = match.group(2).strip()
-            # Remove trailing reward points (integer) from description
-            description = re.sub(r'\s+-?\d+$', '', description).strip()
-            amount_str = match.group(3).replace(',', '')
-            is_credit = match.group(4) is not None
-
-            try:
-                amount = float(amount_str)
-                expenses.append(ExpenseItem(
-                    date=date_str,
-                    description=description,
-                    amount=amount,
-                    transaction_type="credit" if is_credit else "debit",
-                    bank="hdfc",
-                    category=categorize_expense(description)
-                ))
-            except ValueError:
-                continue
-
-        return expenses
+        # Trailing reward points (an integer) are stripped from the description.
+        return [
+            _make_expense(
+                date_str, _REWARD2.sub('', description.strip()).strip(), amount_str,
+                bool(credit), "hdfc",
+            )
+            for date_str, description, amount_str, credit in _HDFC_P2.findall(text)
+        ]
 
     def _parse_sbi_statement(self, text: str) -> list[ExpenseItem]:
         """Parse SBI Card credit card statement."""
-        expenses = []
-
         # SBI format: DD Mon YY Description Amount Type
         # Type: M (debit), D (debit), C (credit)
         # Example: 13 Feb 26 FP EMI 05/06(EXCL TAX 49.73) 10,569.35 M
         # Example: 24 Jan 26 NEFTO00000000000000000HDFCH00757618150 13,142.00 C
-        pattern = r'(\d{2}\s+\w{3}\s+\d{2})\s+(.+?)\s+([\d,]+\.\d{2})\s+([MDC])'
-
-        for match in re.finditer(pattern, text):
-            date_str = normalize_date_str(match.group(1))
-            description = match.group(2).strip()
-            amount_str = match.group(3).replace(',', '')
-            txn_type = match.group(4).upper()
-
-            try:
-                amount = float(amount_str)
-                expenses.append(ExpenseItem(
-                    date=date_str,
-                    description=description,
-                    amount=amount,
-                    transaction_type="credit" if txn_type == 'C' else "debit",
-                    bank="sbi",
-                    category=categorize_expense(description)
-                ))
-            except ValueError:
-                continue
-
-        return expenses
+        return [
+            _make_expense(
+                normalize_date_str(date_str), description.strip(), amount_str,
+                txn_type.upper() == 'C', "sbi",
+            )
+            for date_str, description, amount_str, txn_type in _SBI.findall(text)
+        ]
 
     def _parse_idfc_statement(self, text: str) -> list[ExpenseItem]:
         """Parse IDFC First Bank credit card statement."""
-        expenses = []
-
         # IDFC has two date formats:
         # Format 1: DD Mon YY Description Amount CR/DR
         # Example: 31 Aug 24 Innovative Retail Concept, Bangalore Convert 3,780.41 DR
         # Format 2: DD/MM/YYYY Description Amount CR/DR
         # Example: 28/06/2024 ADISHWAR INDIA LIMITED, BANGALORE Convert 4,248.00 DR
-        patterns = [
-            r'(\d{2}\s+\w{3}\s+\d{2})\s+(.+?)\s+([\d,]+\.\d{2})\s+(CR|DR)',
-            r'(\d{2}/\d{2}/\d{4})\s+(.+?)\s+([\d,]+\.\d{2})\s+(CR|DR)',
+        return [
+            _make_expense(
+                normalize_date_str(date_str), description.strip(), amount_str,
+                txn_type.upper() == 'CR', "idfc",
+            )
+            for pattern in _IDFC
+            for date_str, description, amount_str, txn_type in pattern.findall(text)
         ]
 
-        for pattern in patterns:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                date_str = normalize_date_str(match.group(1))
-                description = match.group(2).strip()
-                amount_str = match.group(3).replace(',', '')
-                txn_type = match.group(4).upper()
-
-                try:
-                    amount = float(amount_str)
-                    expenses.append(ExpenseItem(
-                        date=date_str,
-                        description=description,
-                        amount=amount,
-                        transaction_type="credit" if txn_type == 'CR' else "debit",
-                        bank="idfc",
-                        category=categorize_expense(description)
-                    ))
-                except ValueError:
-                    continue
-
-        return expenses
-
     def _parse_generic_statement(self, text: str) -> list[ExpenseItem]:
         """Generic parser for unknown bank formats."""
-        expenses = []
-
         # Try to match common date-description-amount patterns
-        patterns = [
-            r'(\d{2}/\d{2}/\d{4})\s+(.+?)\s+([\d,]+\.\d{2})',
-            r'(\d{2}-\d{2}-\d{4})\s+(.+?)\s+([\d,]+\.\d{2})',
-            r'(\d{2}\s+\w{3}\s+\d{4})\s+(.+?)\s+([\d,]+\.\d{2})',
+        return [
+            _make_expense(
+                normalize_date_str(date_str), description.strip(), amount_str,
+                False, self.bank,
+            )
+            for pattern in _GENERIC
+            for date_str, description, amount_str in pattern.findall(text)
         ]
 
-        for pattern in patterns:
-            for match in re.finditer(pattern, text):
-                date_str = normalize_date_str(match.group(1))
-                description = match.group(2).strip()
-                amount_str = match.group(3).replace(',', '')
 
-                try:
-                    amount = float(amount_str)
-                    expenses.append(ExpenseItem(
-                        date=date_str,
-                        description=description,
-                        amount=amount,
-                        transaction_type="debit",
-                        bank=self.bank,
-                        category=categorize_expense(description)
-                    ))
-                except ValueError:
-                    continue
-
-        return expenses
-
-
-def parse_statement(pdf_path: Path, bank: str) -> list[ExpenseItem]:
+def parse_statement(pdf_path: Path, bank: str, password: Optional[str] = None) -> list[ExpenseItem]:
     """Convenience function to parse a statement."""
-    parser = StatementParser(bank)
+    parser = StatementParser(bank, password)
     return parser.parse_pdf(pdf_path)
 
 
+def _parse_one(job: tuple[Path, str, str]) -> list[ExpenseItem]:
+    """Worker entry point for parse_statements."""
+    pdf_path, bank, password = job
+    return parse_statement(pdf_path, bank, password)
+
+
+def parse_statements(
+    jobs: list[tuple[Path, str]], max_workers: Optional[int] = None
+) -> list[list[ExpenseItem]]:
+    """Parse several statements in parallel worker processes.
+
+    Takes (pdf_path, bank) pairs and returns each file's expenses in the
+    same order. Passwords are read from BANK_CONFIGS here and handed to the
+    workers, since prompted passwords only exist in this process.
+    """
+    work = [
+        (pdf_path, bank, BANK_CONFIGS[bank].password if bank in BANK_CONFIGS else "")
+        for pdf_path, bank in jobs
+    ]
+    if len(work) <= 1:
+        return [_parse_one(job) for job in work]
+
+    # Spawn rather than fork: callers typically hold a live MongoClient whose
+    # monitor threads make fork() unsafe.
+    with ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        return list(executor.map(_parse_one, work))
+
+
 def print_expenses_as_json(expenses: list[ExpenseItem]) -> None:
     """Print each expense as a JSON object."""
-    for expense in expenses:
-        print(expense.to_json())
+    sys.stdout.write("".join(f"{expense.to_json()}\n" for expense in expenses))
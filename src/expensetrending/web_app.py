@@ -1,5 +1,6 @@
 """FastAPI web dashboard for expense data visualization."""
 
+import logging
 from collections import defaultdict
 from contextlib import asynccontextmanager
 from datetime import datetime
@@ -17,51 +18,24 @@ from .statement_parser import CATEGORY_KEYWORDS
 TEMPLATES_DIR = Path(__file__).parent / "templates"
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
-db: ExpenseDB | None = None
-
-
-def parse_date(date_str: str) -> datetime | None:
-    """Parse a DD/MM/YYYY date string into a datetime object."""
-    try:
-        return datetime.strptime(date_str.strip(), "%d/%m/%Y")
-    except ValueError:
-        return None
-
-
-def month_key(dt: datetime) -> str:
-    """Return YYYY-MM string for grouping."""
-    return dt.strftime("%Y-%m")
+logger = logging.getLogger(__name__)
 
+db: ExpenseDB | None = None
 
-def filter_by_date_range(
-    expenses: list[dict],
-    start_date: str | None = None,
-    end_date: str | None = None,
-) -> list[dict]:
-    """Filter expenses by optional start/end date strings (YYYY-MM-DD)."""
-    if not start_date and not end_date:
-        return expenses
-
-    start_dt = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
-    end_dt = datetime.strptime(end_date, "%Y-%m-%d") if end_date else None
 
-    filtered = []
-    for exp in expenses:
-        dt = parse_date(exp.get("date", ""))
-        if dt is None:
-            continue
-        if start_dt and dt < start_dt:
-            continue
-        if end_dt and dt > end_dt:
-            continue
-        filtered.append(exp)
-    return filtered
+def parse_query_date(date_str: str | None) -> datetime | None:
+    """Parse an optional YYYY-MM-DD query parameter."""
+    return datetime.strptime(date_str, "%Y-%m-%d") if date_str else None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global db
     db = ExpenseDB()
+    # Date filters and sorting use date_iso; backfill it on older records.
+    backfilled = db.add_date_fields()
+    if backfilled:
+        logger.info("Added date fields to %d record(s)", backfilled)
     yield
     if db:
         db.close()
@@ -79,26 +53,20 @@ async def dashboard(request: Request):
 @app.get("/api/monthly-trend")
 async def monthly_trend():
     """Monthly totals grouped by bank for chart rendering."""
-    expenses = db.get_all_debits()
-
-    # bank -> month -> total
-    data: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    # bank -> month -> total in paise
+    data: dict[str, dict[str, int]] = defaultdict(dict)
     all_months: set[str] = set()
 
-    for exp in expenses:
-        dt = parse_date(exp.get("date", ""))
-        if dt is None:
-            continue
-        mk = month_key(dt)
-        all_months.add(mk)
-        data[exp["bank"]][mk] += exp["amount"]
+    for row in db.aggregate_monthly_by_bank():
+        all_months.add(row["month"])
+        data[row["bank"]][row["month"]] = row["total_paise"]
 
     sorted_months = sorted(all_months)
     datasets = []
     for bank, monthly in sorted(data.items()):
         datasets.append({
             "bank": bank,
-            "totals": [round(monthly.get(m, 0), 2) for m in sorted_months],
+            "totals": [monthly.get(m, 0) / 100 for m in sorted_months],
         })
 
     return {"months": sorted_months, "datasets": datasets}
@@ -111,18 +79,14 @@ async def category_breakdown(
     end_date: str | None = Query(None),
 ):
     """Category totals for doughnut chart, with optional filters."""
-    expenses = db.get_filtered_expenses(bank=bank)
-    expenses = filter_by_date_range(expenses, start_date, end_date)
-
-    totals: dict[str, float] = defaultdict(float)
-    for exp in expenses:
-        totals[exp.get("category", "other")] += exp["amount"]
-
-    # Sort by amount descending
-    sorted_cats = sorted(totals.items(), key=lambda x: x[1], reverse=True)
+    by_category = db.aggregate_debits_by_category(
+        bank=bank,
+        start_date=parse_query_date(start_date),
+        end_date=parse_query_date(end_date),
+    )
     return {
-        "categories": [c[0] for c in sorted_cats],
-        "amounts": [round(c[1], 2) for c in sorted_cats],
+        "categories": [row["category"] for row in by_category],
+        "amounts": [row["total_paise"] / 100 for row in by_category],
     }
 
 
@@ -138,25 +102,19 @@ async def transactions(
     sort_order: str = Query("desc"),
 ):
     """Paginated transaction list with sorting."""
-    expenses = db.get_filtered_expenses(bank=bank, category=category)
-    expenses = filter_by_date_range(expenses, start_date, end_date)
-
-    reverse = sort_order == "desc"
-
-    if sort_by == "amount":
-        expenses.sort(key=lambda exp: exp.get("amount", 0), reverse=reverse)
-    else:
-        def sort_key(exp):
-            dt = parse_date(exp.get("date", ""))
-            return dt if dt else datetime.min
-        expenses.sort(key=sort_key, reverse=reverse)
-
-    total = len(expenses)
-    start = (page - 1) * page_size
-    end = start + page_size
+    page_items, total = db.get_paginated(
+        bank=bank,
+        category=category,
+        start_date=parse_query_date(start_date),
+        end_date=parse_query_date(end_date),
+        sort_by=sort_by,
+        sort_order=sort_order,
+        skip=(page - 1) * page_size,
+        limit=page_size,
+    )
 
     return {
-        "transactions": expenses[start:end],
+        "transactions": page_items,
         "total": total,
         "page": page,
         "page_size": page_size,
@@ -167,9 +125,17 @@ async def transactions(
 @app.get("/api/transactions/search")
 async def search_transactions(
     description: str = Query(..., min_length=1),
+    regex: bool = Query(False),
 ):
-    """Search transactions by description substring (case-insensitive)."""
-    results = db.search_by_description(description)
+    """Search transactions by description words (case-insensitive).
+
+    With regex=true, matches any case-insensitive substring instead. Word
+    searches that find nothing also fall back to a substring match, since the
+    dashboard searches as the user types partial words.
+    """
+    results = db.search_by_description(description, regex=regex)
+    if not results and not regex:
+        results = db.search_by_description(description, regex=True)
     return {"transactions": results, "total": len(results)}
 
 
@@ -179,26 +145,21 @@ async def filters():
     return {
         "banks": sorted(db.get_distinct_values("bank")),
         "categories": sorted(db.get_distinct_values("category")),
-        "all_categories": sorted(VALID_CATEGORIES),
-        "transaction_types": sorted(VALID_TRANSACTION_TYPES),
+        "all_categories": _SORTED_VALID_CATEGORIES,
+        "transaction_types": _SORTED_VALID_TRANSACTION_TYPES,
     }
 
 
 @app.get("/api/summary")
 async def summary():
     """Total spent, transaction count, and top category."""
-    expenses = db.get_all_debits()
-    total_spent = sum(exp["amount"] for exp in expenses)
-    count = len(expenses)
-
-    cat_totals: dict[str, float] = defaultdict(float)
-    for exp in expenses:
-        cat_totals[exp.get("category", "other")] += exp["amount"]
-
-    top_category = max(cat_totals, key=cat_totals.get) if cat_totals else "N/A"
+    by_category = db.aggregate_debits_by_category()
+    total_paise = sum(row["total_paise"] for row in by_category)
+    count = sum(row["count"] for row in by_category)
+    top_category = by_category[0]["category"] if by_category else "N/A"
 
     return {
-        "total_spent": round(total_spent, 2),
+        "total_spent": total_paise / 100,
         "transaction_count": count,
         "top_category": top_category,
     }
@@ -206,6 +167,9 @@ async def summary():
 
 VALID_TRANSACTION_TYPES = {"debit", "credit"}
 VALID_CATEGORIES = set(CATEGORY_KEYWORDS.keys()) | {"other"}
+# Dropdown options; the sets are fixed, so sort them once at import.
+_SORTED_VALID_TRANSACTION_TYPES = sorted(VALID_TRANSACTION_TYPES)
+_SORTED_VALID_CATEGORIES = sorted(VALID_CATEGORIES)
 
 
 class TransactionUpdate(BaseModel):
@@ -231,7 +195,7 @@ async def update_transaction(transaction_id: str, body: TransactionUpdate):
         if body.category not in VALID_CATEGORIES:
             raise HTTPException(
                 status_code=400,
-                detail=f"category must be one of: {', '.join(sorted(VALID_CATEGORIES))}",
+                detail=f"category must be one of: {', '.join(_SORTED_VALID_CATEGORIES)}",
             )
         updates["category"] = body.category
 
@@ -1,68 +1,75 @@
 #!/usr/bin/env python3
 """Standalone script to read expenses from MongoDB."""
 
+import argparse
+import atexit
 import json
+import sys
+from collections.abc import Iterable
 from datetime import datetime
 
 from pymongo import MongoClient
+from pymongo.collection import Collection
 
 MONGO_URI = "mongodb://localhost:27017"
 DB_NAME = "expensetrending"
 COLLECTION_NAME = "expenses"
 
+# Shared client, created on first use so every query reuses one connection pool.
+_CLIENT: MongoClient | None = None
+
+
+def _collection() -> Collection:
+    """Return the expenses collection, connecting on first call."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = MongoClient(MONGO_URI, maxPoolSize=10, serverSelectionTimeoutMS=2000)
+        atexit.register(_CLIENT.close)
+    return _CLIENT[DB_NAME][COLLECTION_NAME]
+
+
+def _print_expenses(expenses: Iterable[dict]) -> None:
+    """Print expenses as indented JSON blocks separated by rules, in one write."""
+    separator = "-" * 60
+    sys.stdout.write("".join(
+        f"{json.dumps(expense, indent=2, default=str)}\n{separator}\n" for expense in expenses
+    ))
+
 
 def read_all_expenses():
     """Read and print all expenses from MongoDB."""
-    client = MongoClient(MONGO_URI)
-    db = client[DB_NAME]
-    collection = db[COLLECTION_NAME]
+    collection = _collection()
 
     count = collection.count_documents({})
     print(f"Total expenses in database: {count}\n")
 
     if count == 0:
         print("No expenses found.")
-        client.close()
         return
 
     print("=" * 60)
-    for expense in collection.find():
-        # Remove MongoDB _id for cleaner output
-        expense.pop("_id", None)
-        print(json.dumps(expense, indent=2))
-        print("-" * 60)
-
-    client.close()
+    # Leave out MongoDB _id for cleaner output
+    _print_expenses(collection.find({}, {"_id": 0}))
 
 
 def read_expenses_by_bank(bank: str):
     """Read expenses filtered by bank."""
-    client = MongoClient(MONGO_URI)
-    db = client[DB_NAME]
-    collection = db[COLLECTION_NAME]
+    collection = _collection()
 
     count = collection.count_documents({"bank": bank})
     print(f"Expenses for {bank.upper()}: {count}\n")
 
     if count == 0:
         print(f"No expenses found for {bank}.")
-        client.close()
         return
 
     print("=" * 60)
-    for expense in collection.find({"bank": bank}):
-        expense.pop("_id", None)
-        print(json.dumps(expense, indent=2))
-        print("-" * 60)
-
-    client.close()
+    _print_expenses(collection.find({"bank": bank}, {"_id": 0}))
 
 
 def get_summary():
     """Get summary statistics."""
-    client = MongoClient(MONGO_URI)
-    db = client[DB_NAME]
-    collection = db[COLLECTION_NAME]
+    collection = _collection()
 
     total = collection.count_documents({})
     print(f"Total expenses: {total}")
@@ -87,21 +94,13 @@ def get_summary():
     for r in results:
         print(f"  {r['_id']}: {r['count']} transactions, Total: ₹{r['total']:,.2f}")
 
-    client.close()
-
-
-def _to_mongo_date_str(date_str: str) -> str:
-    """Convert YYYY-MM-DD to DD/MM/YYYY for MongoDB query matching."""
-    dt = datetime.strptime(date_str, "%Y-%m-%d")
-    return dt.strftime("%d/%m/%Y")
-
 
 def read_filtered_expenses(
     bank: str | None = None,
     category: str | None = None,
     transaction_type: str | None = None,
-    since_date: str | None = None,
-    to_date: str | None = None,
+    since_date: datetime | None = None,
+    to_date: datetime | None = None,
 ) -> list[dict]:
     """Return expenses matching the given filters.
 
@@ -109,15 +108,13 @@ def read_filtered_expenses(
         bank: Filter by bank name (e.g. "hdfc", "sbi").
         category: Filter by category (e.g. "food", "travel").
         transaction_type: Filter by "debit" or "credit".
-        since_date: Only include expenses on or after this date (YYYY-MM-DD).
-        to_date: Only include expenses on or before this date (YYYY-MM-DD).
+        since_date: Only include expenses on or after this date.
+        to_date: Only include expenses on or before this date.
 
     Returns:
         List of expense dicts (without _id).
     """
-    client = MongoClient(MONGO_URI)
-    db = client[DB_NAME]
-    collection = db[COLLECTION_NAME]
+    collection = _collection()
 
     query: dict = {}
     if bank:
@@ -127,94 +124,80 @@ def read_filtered_expenses(
     if transaction_type:
         query["transaction_type"] = transaction_type
 
-    # Dates are stored as DD/MM/YYYY strings. Use $expr with
-    # $dateFromString to parse and compare them in the query.
-    date_conditions = []
+    # Compare against the indexed date_iso field stored alongside the
+    # DD/MM/YYYY date string. Older records get it when the web dashboard
+    # starts, or via `expensetrending --add-date-fields`.
+    date_range = {}
     if since_date:
-        since_str = _to_mongo_date_str(since_date)
-        date_conditions.append({
-            "$gte": [
-                {"$dateFromString": {"dateString": "$date", "format": "%d/%m/%Y"}},
-                {"$dateFromString": {"dateString": since_str, "format": "%d/%m/%Y"}},
-            ]
-        })
+        date_range["$gte"] = since_date
     if to_date:
-        to_str = _to_mongo_date_str(to_date)
-        date_conditions.append({
-            "$lte": [
-                {"$dateFromString": {"dateString": "$date", "format": "%d/%m/%Y"}},
-                {"$dateFromString": {"dateString": to_str, "format": "%d/%m/%Y"}},
-            ]
-        })
-
-    if date_conditions:
-        query["$expr"] = {"$and": date_conditions} if len(date_conditions) > 1 else date_conditions[0]
+        date_range["$lte"] = to_date
+    if date_range:
+        query["date_iso"] = date_range
 
     expenses = []
     for expense in collection.find(query, {"_id": 0}):
         expenses.append(expense)
-
-    client.close()
     return expenses
 
 
-def _parse_cli_filters(argv: list[str]) -> dict:
-    """Parse filter arguments from CLI args list."""
-    kwargs = {}
-    i = 0
-    while i < len(argv):
-        if argv[i] == "--bank" and i + 1 < len(argv):
-            kwargs["bank"] = argv[i + 1]
-            i += 2
-        elif argv[i] == "--category" and i + 1 < len(argv):
-            kwargs["category"] = argv[i + 1]
-            i += 2
-        elif argv[i] == "--type" and i + 1 < len(argv):
-            kwargs["transaction_type"] = argv[i + 1]
-            i += 2
-        elif argv[i] == "--since" and i + 1 < len(argv):
-            kwargs["since_date"] = argv[i + 1]
-            i += 2
-        elif argv[i] == "--to" and i + 1 < len(argv):
-            kwargs["to_date"] = argv[i + 1]
-            i += 2
-        else:
-            i += 1
-    return kwargs
-
-
-FILTER_ARGS = {"--filter", "--bank", "--category", "--type", "--since", "--to"}
+def _parse_date(date_str: str) -> datetime:
+    """Parse date string in YYYY-MM-DD format."""
+    return datetime.strptime(date_str, "%Y-%m-%d")
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    """Build the CLI parser; date options are parsed into datetimes."""
+    parser = argparse.ArgumentParser(
+        description="Read expenses from MongoDB. With no options, prints every expense.",
+    )
+    parser.add_argument("--summary", action="store_true", help="Show summary statistics")
+    parser.add_argument(
+        "--filter",
+        action="store_true",
+        help="Filter with the options below (implied by any of them)",
+    )
+    parser.add_argument("--bank", help="Filter by bank (hdfc, sbi, idfc)")
+    parser.add_argument("--category", metavar="CAT", help="Filter by category (food, travel, etc.)")
+    parser.add_argument(
+        "--type",
+        dest="transaction_type",
+        metavar="TYPE",
+        help="Filter by transaction type (debit, credit)",
+    )
+    parser.add_argument(
+        "--since",
+        dest="since_date",
+        type=_parse_date,
+        metavar="YYYY-MM-DD",
+        help="Only include expenses on or after this date",
+    )
+    parser.add_argument(
+        "--to",
+        dest="to_date",
+        type=_parse_date,
+        metavar="YYYY-MM-DD",
+        help="Only include expenses on or before this date",
+    )
+    return parser
 
 
 if __name__ == "__main__":
-    import sys
-
-    if len(sys.argv) > 1:
-        arg = sys.argv[1]
-        if arg == "--summary":
-            get_summary()
-        elif arg in FILTER_ARGS:
-            # All filter flags route to read_filtered_expenses
-            # Skip "--filter" if it's the first arg, parse the rest
-            start = 2 if arg == "--filter" else 1
-            kwargs = _parse_cli_filters(sys.argv[start:])
-            results = read_filtered_expenses(**kwargs)
-            print(f"Found {len(results)} expenses\n")
-            print("=" * 60)
-            for expense in results:
-                print(json.dumps(expense, indent=2))
-                print("-" * 60)
-        else:
-            print("Usage:")
-            print("  python read_expenses.py                        # Read all expenses")
-            print("  python read_expenses.py --summary              # Show summary statistics")
-            print("  python read_expenses.py --bank hdfc            # Filter by bank")
-            print("  python read_expenses.py --since 2025-01-01     # Filter by date")
-            print("  python read_expenses.py --filter [OPTIONS]     # Filter with multiple criteria")
-            print("    --bank BANK        Filter by bank (hdfc, sbi, idfc)")
-            print("    --category CAT     Filter by category (food, travel, etc.)")
-            print("    --type TYPE        Filter by transaction type (debit, credit)")
-            print("    --since YYYY-MM-DD Only include expenses on or after this date")
-            print("    --to YYYY-MM-DD    Only include expenses on or before this date")
+    args = _build_arg_parser().parse_args()
+    filters = {
+        "bank": args.bank,
+        "category": args.category,
+        "transaction_type": args.transaction_type,
+        "since_date": args.since_date,
+        "to_date": args.to_date,
+    }
+
+    if args.summary:
+        get_summary()
+    elif args.filter or any(value is not None for value in filters.values()):
+        results = read_filtered_expenses(**filters)
+        print(f"Found {len(results)} expenses\n")
+        print("=" * 60)
+        _print_expenses(results)
     else:
         read_all_expenses()